@@ -7,41 +7,123 @@ import seaborn as sns
 import streamlit as st
 from zipfile import ZipFile
 import matplotlib.pyplot as plt
+from pyarrow import feather
 from streamlit_extras.switch_page_button import switch_page
 
 
 st.set_page_config(page_title="Data Analysis", page_icon="📊")
 
+CATEGORICAL_COLUMNS = [
+    "client_country",
+    "client_city",
+    "action_label",
+    "client_premium_status",
+    "client_segment",
+    "client_nationality",
+    "client_gender",
+    "product_category",
+    "product_style",
+]
+
+
+def to_categorical(df):
+    """Cast the repeated string columns of a DataFrame to the category dtype.
+
+    Parameters:
+    - df (DataFrame): The DataFrame to convert.
+
+    Returns:
+    - DataFrame: The DataFrame with its categorical columns converted.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
 
 @st.cache_data()
 def read_zip_file(zip_file: str) -> tuple:
-    """Read three CSV files from a zip archive and return them as DataFrames.
+    """Read three CSV or Parquet files from a zip archive and return them as DataFrames.
 
     Parameters:
     - zip_file (str): The path to the zip file.
 
     Returns:
-    - tuple: A tuple containing three DataFrames read from the CSV files.
+    - tuple: A tuple containing three DataFrames read from the CSV or Parquet files.
     """
     with ZipFile(zip_file, "r") as z:
         dataframes = {}
         for name in z.namelist():
-            if name.endswith(".csv"):
+            if name.endswith(".parquet"):
+                # Extract DataFrame name from Parquet file name
+                dataframe_name = os.path.splitext(os.path.basename(name))[0] + "_df"
+                with z.open(name) as f:
+                    df = pd.read_parquet(io.BytesIO(f.read()), engine="pyarrow")
+                dataframes[dataframe_name] = to_categorical(df)
+            elif name.endswith(".csv"):
                 # Extract DataFrame name from CSV file name
                 dataframe_name = os.path.splitext(os.path.basename(name))[0] + "_df"
                 with z.open(name) as f:
                     df = pd.read_csv(io.TextIOWrapper(f, "utf-8"))
-                dataframes[dataframe_name] = df
+                dataframes[dataframe_name] = to_categorical(df)
     return tuple(dataframes.values())
 
 
+def read_data_file(name: str):
+    """Read a data file from the data folder, in the fastest format available.
+
+    The Arrow and Parquet files are written by src/convert_data.py, the CSV
+    file is used when they have not been generated.
+
+    Parameters:
+    - name (str): The name of the file, without extension.
+
+    Returns:
+    - DataFrame: The data read from the file.
+    """
+    if os.path.exists(f"data/{name}.arrow"):
+        return feather.read_table(f"data/{name}.arrow").to_pandas()
+    if os.path.exists(f"data/{name}.parquet"):
+        return pd.read_parquet(f"data/{name}.parquet", engine="pyarrow")
+    return pd.read_csv(f"data/{name}.csv")
+
+
 @st.cache_data()
 def preloaded():
-    actions_df = pd.read_csv("data/actions.csv")
-    clients_df = pd.read_csv("data/clients.csv")
-    transactions_df = pd.read_csv("data/transactions.csv")
+    actions_df = read_data_file("actions")
+    clients_df = read_data_file("clients")
+    transactions_df = read_data_file("transactions")
+
+    return (
+        to_categorical(actions_df),
+        to_categorical(clients_df),
+        to_categorical(transactions_df),
+    )
 
-    return actions_df, clients_df, transactions_df
+
+@st.cache_data()
+def build_merged(actions_df, clients_df, transactions_df):
+    """Merge actions, clients and transactions on client_id and parse the date columns.
+
+    Parameters:
+    - actions_df (DataFrame): Actions data.
+    - clients_df (DataFrame): Clients data, with one row per client_id.
+    - transactions_df (DataFrame): Transactions data.
+
+    Returns:
+    - DataFrame: The merged DataFrame with datetime date columns.
+    """
+    merged_df = actions_df.merge(
+        clients_df.set_index("client_id"),
+        left_on="client_id",
+        right_index=True,
+        how="left",
+        validate="m:1",
+    ).merge(transactions_df, on="client_id", how="left", validate="m:m")
+    for col in ["transaction_date", "action_start_date", "action_end_date"]:
+        merged_df[col] = pd.to_datetime(merged_df[col], format="ISO8601", cache=True)
+
+    return merged_df
 
 
 @st.cache_data()
@@ -90,14 +172,12 @@ if (
     st.subheader("Key Metrics")
 
     # Merge dataframes on client_id
-    merged_df = pd.merge(actions_df, clients_df, on="client_id", how="left")
-    merged_df = pd.merge(merged_df, transactions_df, on="client_id", how="left")
+    merged_df = build_merged(actions_df, clients_df, transactions_df)
 
     # Sidebar filters
     st.sidebar.header("Filters")
 
     # Start and end date filter
-    merged_df["transaction_date"] = pd.to_datetime(merged_df["transaction_date"])
     min_date = merged_df["transaction_date"].min()
     max_date = merged_df["transaction_date"].max()
     start_date = pd.Timestamp(
@@ -139,29 +219,19 @@ if (
         "Premium Status", premium_status_options
     )
 
-    # Apply filters
-    filtered_df = merged_df[
-        (
-            (selected_client_attendance == "All")
-            | (merged_df["client_is_present"] == selected_client_attendance)
-        )
-        & (
-            (selected_event_type == "All")
-            | (merged_df["action_label"] == selected_event_type)
-        )
-        & (
-            (selected_country == "All")
-            | (merged_df["client_country"] == selected_country)
-        )
-        & (
-            (selected_premium_status == "All")
-            | (merged_df["client_premium_status"] == selected_premium_status)
-        )
-        & (
-            (merged_df["transaction_date"] >= start_date)
-            & (merged_df["transaction_date"] <= end_date)
-        )
-    ]
+    # Apply filters, only computing the masks of the filters that are set
+    mask = (merged_df["transaction_date"] >= start_date) & (
+        merged_df["transaction_date"] <= end_date
+    )
+    if selected_client_attendance != "All":
+        mask &= merged_df["client_is_present"] == selected_client_attendance
+    if selected_event_type != "All":
+        mask &= merged_df["action_label"] == selected_event_type
+    if selected_country != "All":
+        mask &= merged_df["client_country"] == selected_country
+    if selected_premium_status != "All":
+        mask &= merged_df["client_premium_status"] == selected_premium_status
+    filtered_df = merged_df[mask]
 
     # Calculate the total gross amount in millions with the Euro symbol
     total_gross_amount_millions = filtered_df["gross_amount_euro"].sum() / 1e6
@@ -195,14 +265,22 @@ if (
 
     st.subheader("📈 Monthly Evolution of Gross Amount")
 
-    # Group by month and sum the 'gross_amount_euro'
-    filtered_df["transaction_date"] = filtered_df["transaction_date"].dropna()
-    monthly_gross_amount = (
-        filtered_df.groupby(pd.Grouper(key="transaction_date", freq="M"))[
-            "gross_amount_euro"
-        ]
-        .sum()
-        .reset_index()
+    # Sum the 'gross_amount_euro' per month with a bincount over month numbers
+    month_codes = (
+        filtered_df["transaction_date"].values.astype("datetime64[M]").astype("int64")
+    )
+    first_month = month_codes.min() if month_codes.size else 0
+    monthly_sums = np.bincount(
+        month_codes - first_month,
+        weights=np.nan_to_num(filtered_df["gross_amount_euro"].to_numpy(dtype=float)),
+    )
+    monthly_gross_amount = pd.DataFrame(
+        {
+            "transaction_date": (
+                first_month + np.arange(monthly_sums.size)
+            ).astype("datetime64[M]"),
+            "gross_amount_euro": monthly_sums,
+        }
     )
 
     # Plot the monthly evolution
@@ -220,13 +298,31 @@ if (
     # Calculate total attendance across all countries
     total_attendance = filtered_df["client_is_present"].sum()
 
-    # Calculate attendance per country
-    attendance_per_country = (
-        filtered_df.groupby("client_country")["client_is_present"].sum().reset_index()
+    # Calculate attendance per country with a bincount over country codes
+    country_codes, countries = pd.factorize(filtered_df["client_country"])
+    is_known_country = country_codes >= 0
+    attendance_per_country = np.bincount(
+        country_codes[is_known_country],
+        weights=np.nan_to_num(
+            filtered_df["client_is_present"].to_numpy(dtype=float)[is_known_country]
+        ),
+        minlength=len(countries),
     )
 
     # Sort by attendance rate and select the top 10 countries
-    top_countries = attendance_per_country.nlargest(10, "client_is_present")
+    k = min(10, attendance_per_country.size)
+    top_idx = (
+        np.argpartition(-attendance_per_country, k - 1)[:k]
+        if k > 0
+        else np.empty(0, int)
+    )
+    top_idx = top_idx[np.argsort(-attendance_per_country[top_idx], kind="stable")]
+    top_countries = pd.DataFrame(
+        {
+            "client_country": np.asarray(countries)[top_idx],
+            "client_is_present": attendance_per_country[top_idx],
+        }
+    )
 
     # Calculate percentage of attendance for each country based on the total attendance
     top_countries["attendance_percentage"] = (
@@ -257,9 +353,6 @@ if (
     # Display filtered dataframe
     st.subheader("🕒 Average Duration of Each Type of Event")
 
-    filtered_df["action_start_date"] = pd.to_datetime(filtered_df["action_start_date"])
-    filtered_df["action_end_date"] = pd.to_datetime(filtered_df["action_end_date"])
-
     # Calculate event durations in days
     filtered_df["action_duration_days"] = (
         filtered_df["action_end_date"] - filtered_df["action_start_date"]
@@ -271,7 +364,9 @@ if (
 
     # Group by action label and calculate the average duration
     avg_duration_per_action = (
-        filtered_df.groupby("action_label")["action_duration_days"].mean().reset_index()
+        filtered_df.groupby("action_label", observed=True)["action_duration_days"]
+        .mean()
+        .reset_index()
     )
 
     # Sort the DataFrame by average duration in descending order
@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 
 st.set_page_config(page_title="Client Suggestion", page_icon="🧑🏻‍💼")
@@ -79,10 +80,13 @@ if get_old_clients_button:
         filtered_prev_clients["uplift_pred"] > 0
     ]
 
-    # Get top X client IDs based on highest uplift_pred values
-    top_clients = filtered_prev_clients.nlargest(top_clients, "uplift_pred")[
-        ["client_id", "uplift_pred"]
-    ]
+    # Get top X client IDs based on highest uplift_pred values, partitioning
+    # the uplifts before sorting only the top X
+    uplift = filtered_prev_clients["uplift_pred"].to_numpy()
+    k = min(top_clients, uplift.size)
+    top_idx = np.argpartition(-uplift, k - 1)[:k] if k > 0 else np.empty(0, int)
+    top_idx = top_idx[np.argsort(-uplift[top_idx], kind="stable")]
+    top_clients = filtered_prev_clients.iloc[top_idx][["client_id", "uplift_pred"]]
 
     # Display the DataFrame
     st.write(
@@ -0,0 +1,37 @@
+"""Convert the raw CSV data files to Parquet and Arrow files."""
+import pandas as pd
+from pyarrow import feather
+
+DATA_FILES = ["actions", "clients", "transactions"]
+
+
+def convert_csv_to_parquet(data_dir: str = "data") -> None:
+    """Convert the actions, clients and transactions CSV files to Parquet files.
+
+    The Parquet files are written next to the CSV files, with the same name.
+    String columns are dictionary encoded by pyarrow.
+
+    Args:
+        data_dir (str, optional): directory containing the CSV files. Defaults to "data".
+    """
+    for name in DATA_FILES:
+        df = pd.read_csv(f"{data_dir}/{name}.csv")
+        df.to_parquet(f"{data_dir}/{name}.parquet", engine="pyarrow", index=False)
+
+
+def convert_csv_to_arrow(data_dir: str = "data") -> None:
+    """Convert the actions, clients and transactions CSV files to LZ4 compressed Arrow IPC files.
+
+    The Arrow files are written next to the CSV files, with the same name.
+
+    Args:
+        data_dir (str, optional): directory containing the CSV files. Defaults to "data".
+    """
+    for name in DATA_FILES:
+        df = pd.read_csv(f"{data_dir}/{name}.csv")
+        feather.write_feather(df, f"{data_dir}/{name}.arrow", compression="lz4")
+
+
+if __name__ == "__main__":
+    convert_csv_to_parquet()
+    convert_csv_to_arrow()
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 CLIENTS_SIMILARITY_RULES = {
@@ -7,6 +8,13 @@ CLIENTS_SIMILARITY_RULES = {
     "same_gender": 3,
 }
 
+CLIENTS_SIMILARITY_COLUMNS = {
+    "same_country": "client_country",
+    "same_nationality": "client_nationality",
+    "same_city": "client_city",
+    "same_gender": "client_gender",
+}
+
 
 def filter_client_df(clients_df, transactions_df):
     """Filter client DataFrame to keep only contactable clients.
@@ -35,70 +43,100 @@ def filter_client_df(clients_df, transactions_df):
     return filtered_clients_df
 
 
-def similarity_score(row, client_data):
-    """Compute a similarity score between clients based on country, nationality, city, and gender.
+def encode_similarity_columns(filtered_clients_df):
+    """Encode the columns used by the similarity rules as integer codes.
 
     Args:
-        row (Series): Row of the DataFrame representing a client.
-        client_data (dict): Dictionary containing data of the reference client.
+        filtered_clients_df (DataFrame): DataFrame containing filtered client data.
 
     Returns:
-        int: Similarity score between the current client and the reference client.
+        ndarray: Array of shape (n_clients, n_rules) with one column of codes per similarity rule, missing values are coded -1.
     """
-    score = 0
-    if row["client_country"] == client_data["client_country"]:
-        score += CLIENTS_SIMILARITY_RULES["same_country"]
+    return np.column_stack(
+        [
+            pd.factorize(filtered_clients_df[column])[0].astype(np.int32)
+            for column in CLIENTS_SIMILARITY_COLUMNS.values()
+        ]
+    )
+
+
+def group_candidate_clients(filtered_clients_df):
+    """Group the clients that did no transaction by segment and premium status.
+
+    Args:
+        filtered_clients_df (DataFrame): DataFrame containing filtered client data.
+
+    Returns:
+        dict: Dictionary mapping (client_segment, client_premium_status) to the row positions of the candidate clients.
+    """
+    no_transaction_positions = np.flatnonzero(
+        ~filtered_clients_df["has_already_done_transaction"].to_numpy()
+    )
+    groups = (
+        filtered_clients_df.iloc[no_transaction_positions]
+        .groupby(["client_segment", "client_premium_status"], sort=False)
+        .indices
+    )
 
-    if row["client_nationality"] == client_data["client_nationality"]:
-        score += CLIENTS_SIMILARITY_RULES["same_nationality"]
+    return {key: no_transaction_positions[idx] for key, idx in groups.items()}
 
-    if row["client_city"] == client_data["client_city"]:
-        score += CLIENTS_SIMILARITY_RULES["same_city"]
 
-    if row["client_gender"] == client_data["client_gender"]:
-        score += CLIENTS_SIMILARITY_RULES["same_gender"]
+def similarity_scores(candidate_codes, client_codes):
+    """Compute the similarity scores between candidate clients and a reference client.
 
-    return score
+    Args:
+        candidate_codes (ndarray): Encoded similarity columns of the candidate clients.
+        client_codes (ndarray): Encoded similarity columns of the reference client.
+
+    Returns:
+        ndarray: Similarity score of each candidate client.
+    """
+    weights = np.array(
+        [CLIENTS_SIMILARITY_RULES[rule] for rule in CLIENTS_SIMILARITY_COLUMNS],
+        dtype=np.int32,
+    )
+    # Missing values are coded -1 and never match, like NaN comparisons
+    matches = (candidate_codes == client_codes) & (client_codes >= 0)
+
+    return matches @ weights
 
 
-def get_closest_clients(client_id, filtered_clients_df):
+def get_closest_clients(client_id, indexed_clients_df, candidate_groups, client_codes):
     """Find the closest clients, among all clients that did no transaction, to a given input client.
 
     Args:
         client_id (str): ID of the client.
-        filtered_clients_df (DataFrame): DataFrame containing filtered client data.
+        indexed_clients_df (DataFrame): DataFrame containing filtered client data, indexed by client_id.
+        candidate_groups (dict): Candidate clients grouped by segment and premium status, see group_candidate_clients.
+        client_codes (ndarray): Encoded similarity columns of all clients, see encode_similarity_columns.
 
     Returns:
-        dict: Dictionary containing closest clients and their similarity scores.
+        DataFrame: DataFrame with the closest clients' IDs and their similarity scores.
     """
-    client_data = filtered_clients_df.query(f"client_id == '{client_id}'").iloc[0]
+    position = indexed_clients_df.index.get_loc(client_id)
+    client_data = indexed_clients_df.iloc[position]
 
-    same_segment = (
-        filtered_clients_df["client_segment"] == client_data["client_segment"]
-    )
-    same_status = (
-        filtered_clients_df["client_premium_status"]
-        == client_data["client_premium_status"]
+    candidates = candidate_groups.get(
+        (client_data["client_segment"], client_data["client_premium_status"])
     )
-    has_never_done_transaction = (
-        filtered_clients_df["has_already_done_transaction"] == False
+    if candidates is None:
+        return pd.DataFrame(
+            {
+                "client_id": pd.Series(dtype=object),
+                "similarity_score": pd.Series(dtype=np.int32),
+            }
+        )
+
+    scores = similarity_scores(client_codes[candidates], client_codes[position])
+    is_close = scores > 0
+
+    closest_clients = pd.DataFrame(
+        {
+            "client_id": indexed_clients_df.index.to_numpy()[candidates][is_close],
+            "similarity_score": scores[is_close],
+        }
     )
 
-    similar_clients = filtered_clients_df[
-        same_segment & same_status & has_never_done_transaction
-    ].copy()
-    similar_clients["similarity_score"] = similar_clients.apply(
-        lambda row: similarity_score(row, client_data), axis=1
-    )
-
-    closest_clients = similar_clients[similar_clients["similarity_score"] > 0]
-    closest_clients = {
-        client_id: score
-        for client_id, score in closest_clients[
-            ["client_id", "similarity_score"]
-        ].values
-    }
-
     return closest_clients
 
 
@@ -118,26 +156,28 @@ def generate_best_new_clients(client_id_list, clients_df, transactions_df):
         dict: Dictionary containing the best new clients and their combined similarity scores.
     """
     filtered_clients_df = filter_client_df(clients_df, transactions_df)
-
-    all_closest_clients = []
-
-    for client_id in client_id_list:
-        closest_clients = get_closest_clients(client_id, filtered_clients_df)
-        all_closest_clients.append(closest_clients)
-
-    best_new_clients = {}
-    for closest_clients in all_closest_clients:
-        for client, score in closest_clients.items():
-            if client in best_new_clients:
-                best_new_clients[client] += score
-            else:
-                best_new_clients[client] = score
-
-    best_new_clients = dict(
-        sorted(best_new_clients.items(), key=lambda item: item[1], reverse=True)
+    candidate_groups = group_candidate_clients(filtered_clients_df)
+    indexed_clients_df = filtered_clients_df.set_index("client_id")
+    client_codes = encode_similarity_columns(filtered_clients_df)
+
+    parts = [
+        get_closest_clients(
+            client_id, indexed_clients_df, candidate_groups, client_codes
+        )
+        for client_id in client_id_list
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return {}
+
+    best_new_clients = (
+        pd.concat(parts, ignore_index=True)
+        .groupby("client_id", sort=False)["similarity_score"]
+        .sum()
+        .sort_values(ascending=False, kind="stable")
     )
 
-    return best_new_clients
+    return best_new_clients.to_dict()
 
 
 if __name__ == "__main__":
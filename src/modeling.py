@@ -1,15 +1,12 @@
+import os
 import pandas as pd
-from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.impute import SimpleImputer
 from sklearn.model_selection import GroupShuffleSplit
 from xgboost import XGBRegressor
 from sklearn.metrics import root_mean_squared_error
 from src.preprocessor import get_and_merge_data
 
-df = get_and_merge_data()
-
 as_idx = ["action_id", "client_id"]
 to_drop = [
     "transaction_date",
@@ -28,50 +25,38 @@ categorical_cols = [
     "action_category_label",
     "action_channel",
     "action_label",
-    "product_category",
-    "product_subcategory",
-    "product_style",
+    "favorite_category",
+    "favorite_style",
     "client_country",
     "client_city",
 ]
 
+df = get_and_merge_data(drop_cols=to_drop)
 df = df.set_index(as_idx, drop=True)
-df = df.drop(to_drop, axis=1)
+df = df.drop(to_drop, axis=1, errors="ignore")
 df["action_duration"] = df["action_duration"].dt.total_seconds() / (60 * 60 * 24)
-# Set the maximum number of categories for OneHotEncoder
-
-max_categories = 15
+# Let XGBoost split on the categories directly instead of one-hot encoding them
+for col in categorical_cols:
+    df[col] = df[col].astype("category")
+# enable_categorical rejects object columns, so cast any remaining string column
+object_cols = df.select_dtypes("object").columns
+df[object_cols] = df[object_cols].astype("category")
 
-# Set the threshold frequency for merging less frequent categories
-threshold_frequency = 2
+# Set XGB_DEVICE=cuda to train on the GPU
+device = os.environ.get("XGB_DEVICE", "cpu")
 
 # Create the pipeline
 pipeline = Pipeline(
     [
         (
-            "preprocessor",
-            ColumnTransformer(
-                transformers=[
-                    (
-                        "cat",
-                        Pipeline(
-                            [
-                                (
-                                    "onehot",
-                                    OneHotEncoder(
-                                        handle_unknown="ignore",
-                                        max_categories=max_categories,
-                                    ),
-                                ),
-                            ]
-                        ),
-                        categorical_cols,
-                    )
-                ],
-                remainder="passthrough",
+            "classifier",
+            XGBRegressor(
+                tree_method="hist",
+                enable_categorical=True,
+                device=device,
+                n_jobs=-1,
             ),
         ),
-        ("classifier", XGBRegressor()),
     ]
 )
 
@@ -1,22 +1,112 @@
+import csv
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
-def get_and_merge_data(data_dir: str = "data", merge_colname: str = "client_id") -> pd.DataFrame:
+TRANSACTIONS_COLUMNS = [
+    "client_id",
+    "transaction_date",
+    "product_quantity",
+    "gross_amount_euro",
+    "product_category",
+    "product_style",
+]
+TRANSACTIONS_TYPES = {
+    "product_category": pa.dictionary(pa.int32(), pa.string()),
+    "product_style": pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def read_csv_with_arrow(
+    filepath: str,
+    include_columns: list = None,
+    column_types: dict = None,
+    drop_cols: set = frozenset(),
+) -> pd.DataFrame:
+    """read a csv file with the multithreaded pyarrow reader
+
+    Args:
+        filepath (str): path of the csv file
+        include_columns (list, optional): columns to read. Defaults to None, all columns.
+        column_types (dict, optional): arrow types of some columns. Defaults to None, inferred.
+        drop_cols (set, optional): columns to leave out. Defaults to frozenset().
+
+    Returns:
+        pd.DataFrame: csv data, dictionary columns come out as categoricals
+    """
+    if drop_cols:
+        # only parse the kept columns, listed from the header line
+        with open(filepath, newline="", encoding="utf-8-sig") as f:
+            header = next(csv.reader(f))
+        include_columns = [
+            col for col in include_columns or header if col not in drop_cols
+        ]
+    table = pacsv.read_csv(
+        filepath,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=include_columns, column_types=column_types
+        ),
+    )
+    return table.to_pandas()
+
+
+def get_and_merge_data(
+    data_dir: str = "data", merge_colname: str = "client_id", drop_cols: list = None
+) -> pd.DataFrame:
     """get data from filepaths and merge them together
 
     Args:
         data_dir (str): _description_
         merge_colname (str, optional): key column for the merge. Defaults to "client_id".
+        drop_cols (list, optional): actions and clients columns not to read. Defaults to None.
 
     Returns:
         pd.DataFrame: merged dataframe
     """
-    df_actions = pd.read_csv(f"{data_dir}/actions.csv")
-    df_clients = pd.read_csv(f"{data_dir}/clients.csv")
-    df_transactions = pd.read_csv(f"{data_dir}/transactions.csv")
+    drop_cols = set(drop_cols or []) - {merge_colname}
+    df_actions = read_csv_with_arrow(f"{data_dir}/actions.csv", drop_cols=drop_cols)
+    df_clients = read_csv_with_arrow(f"{data_dir}/clients.csv", drop_cols=drop_cols)
+    # only read the columns used by the aggregation
+    df_transactions = read_csv_with_arrow(
+        f"{data_dir}/transactions.csv",
+        include_columns=TRANSACTIONS_COLUMNS,
+        column_types=TRANSACTIONS_TYPES,
+    )
     df_transactions = aggregate_transactions(df_transactions)
-    df = pd.merge(df_transactions, df_clients, on=merge_colname, how="left")
-    df = pd.merge(df, df_actions, on=merge_colname, how="left")
-    return df
+    df_clients = df_clients.set_index(merge_colname)
+    df_actions = df_actions.set_index(merge_colname)
+    df = df_transactions.join(
+        df_clients, on=merge_colname, how="left", validate="m:1"
+    ).join(df_actions, on=merge_colname, how="left", validate="m:m")
+    return df.reset_index(drop=True)
+
+
+def most_frequent_value(df: pd.DataFrame, keys: list, colname: str) -> pd.Series:
+    """get the most frequent value of a column for each group, ties go to the smallest value
+
+    Args:
+        df (pd.DataFrame): data to group
+        keys (list): columns to group by
+        colname (str): column to get the most frequent value of
+
+    Returns:
+        pd.Series: most frequent value of the column, indexed by the group keys
+    """
+    values = df[colname]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # group in value order, whatever order the categories were read in
+        df = df.assign(
+            **{
+                colname: values.cat.reorder_categories(
+                    values.cat.categories.sort_values()
+                )
+            }
+        )
+    counts = (
+        df.groupby(keys + [colname], observed=True).size().reset_index(name="count")
+    )
+    counts = counts.sort_values("count", ascending=False, kind="stable")
+    return counts.drop_duplicates(subset=keys).set_index(keys)[colname]
 
 
 def aggregate_transactions(df_transactions) -> pd.DataFrame:
@@ -28,16 +118,23 @@ def aggregate_transactions(df_transactions) -> pd.DataFrame:
     Returns:
         pd.DataFrame: transactions data aggregated
     """
-    trans_gr = df_transactions.groupby(["client_id", "transaction_date"]).agg({
-    'product_quantity': 'sum',
-    'gross_amount_euro':'sum',
-    'product_category': [lambda x: x.mode().iloc[0], lambda x: len(x.value_counts())],
-    'product_style': [lambda x: x.mode(), lambda x: len(x.value_counts())],
-    })
-
-    trans_gr.columns = ["nr_items_purchased", "money_spent", 
-                        "favorite_category", "nr_categories_purchased", 
-                        "favorite_style", "nr_styles_purchased"
-                        ]
-    return trans_gr.reset_index(drop=False)
+    keys = ["client_id", "transaction_date"]
+    trans_gr = df_transactions.groupby(keys).agg(
+        nr_items_purchased=("product_quantity", "sum"),
+        money_spent=("gross_amount_euro", "sum"),
+        nr_categories_purchased=("product_category", "nunique"),
+        nr_styles_purchased=("product_style", "nunique"),
+    )
+    trans_gr["favorite_category"] = most_frequent_value(
+        df_transactions, keys, "product_category"
+    )
+    trans_gr["favorite_style"] = most_frequent_value(
+        df_transactions, keys, "product_style"
+    )
 
+    trans_gr = trans_gr[
+        ["nr_items_purchased", "money_spent",
+         "favorite_category", "nr_categories_purchased",
+         "favorite_style", "nr_styles_purchased"]
+    ]
+    return trans_gr.reset_index(drop=False)
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from src.preprocessor import (
+    TRANSACTIONS_COLUMNS,
+    TRANSACTIONS_TYPES,
+    aggregate_transactions,
+    read_csv_with_arrow,
+)
+
+
+def test_favorites_ties_go_to_the_smallest_value(tmp_path):
+    filepath = tmp_path / "transactions.csv"
+    filepath.write_text(
+        "client_id,transaction_date,product_quantity,gross_amount_euro,"
+        "product_category,product_style\n"
+        "c1,2023-01-01,1,10.0,zeta,s2\n"
+        "c1,2023-01-01,1,20.0,alpha,s1\n"
+    )
+    df_transactions = read_csv_with_arrow(
+        str(filepath),
+        include_columns=TRANSACTIONS_COLUMNS,
+        column_types=TRANSACTIONS_TYPES,
+    )
+
+    trans_gr = aggregate_transactions(df_transactions)
+
+    assert trans_gr.loc[0, "favorite_category"] == "alpha"
+    assert trans_gr.loc[0, "favorite_style"] == "s1"
+    assert trans_gr.loc[0, "nr_categories_purchased"] == 2
+
+
+def test_favorites_match_mode_for_object_columns():
+    df_transactions = pd.DataFrame(
+        {
+            "client_id": ["c1", "c1", "c1", "c2"],
+            "transaction_date": ["2023-01-01"] * 4,
+            "product_quantity": [1, 1, 1, 1],
+            "gross_amount_euro": [10.0, 20.0, 30.0, 40.0],
+            "product_category": ["zeta", "beta", "beta", "alpha"],
+            "product_style": ["s2", "s1", "s3", "s1"],
+        }
+    )
+
+    trans_gr = aggregate_transactions(df_transactions).set_index("client_id")
+
+    assert trans_gr.loc["c1", "favorite_category"] == "beta"
+    assert trans_gr.loc["c1", "favorite_style"] == "s1"
+    assert trans_gr.loc["c2", "favorite_category"] == "alpha"